@@ -1,5 +1,6 @@
 import asyncio
 import json
+import orjson
 import re
 import logging
 from playwright.async_api import async_playwright
@@ -1502,8 +1503,8 @@ class EnhancedSearchScraper:
                     
                     # Save results to file
                     output_file = f"search_results_{query_index + 1}.json"
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(all_results[query], f, indent=2, ensure_ascii=False)
+                    with open(output_file, 'wb') as f:
+                        f.write(orjson.dumps(all_results[query], option=orjson.OPT_INDENT_2))
                     
                     logging.info(f"Saved results for query '{query}' to {output_file}")
                     
@@ -1524,9 +1525,10 @@ class EnhancedSearchScraper:
                         logging.info(f"Waiting {wait_time:.2f} seconds before next query...")
                         await asyncio.sleep(wait_time)
                 
-                # Save all results
-                with open("all_search_results.json", 'w', encoding='utf-8') as f:
-                    json.dump(all_results, f, indent=2, ensure_ascii=False)
+                # Save all results; per-query files above already persist each
+                # chunk as it finishes, so a crash mid-run loses at most one query.
+                with open("all_search_results.json", 'wb') as f:
+                    f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2))
                 
                 logging.info("Scraping completed. Results saved to all_search_results.json")
                 return all_results
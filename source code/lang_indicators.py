@@ -7,10 +7,25 @@ Enhanced with extensive word libraries for better Devanagari language detection
 from langdetect import detect, DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
 import re
+import numpy as np
 
 # For consistent results
 DetectorFactory.seed = 0
 
+# Devanagari Unicode block
+_DEVANAGARI_LO = 0x0900
+_DEVANAGARI_HI = 0x097F
+
+# Whitespace codepoints matching str.split() word boundaries — all of
+# Unicode, not just ASCII, since scraped web text carries U+00A0 and
+# friends. U+3000 IDEOGRAPHIC SPACE is the highest whitespace codepoint.
+_WHITESPACE_CPS = np.array([c for c in range(0x3000 + 1) if chr(c).isspace()], dtype=np.uint32)
+
+def _codepoints(text):
+    """View text as a uint32 codepoint array — one C-level conversion
+    instead of a per-character Python loop."""
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
 class SmartLanguageDetector:
     def __init__(self):
         # Languages that langdetect handles well
@@ -320,17 +335,30 @@ class SmartLanguageDetector:
 
     def is_devanagari_script(self, text):
         """Check if text uses Devanagari script"""
-        return any('\u0900' <= char <= '\u097F' for char in text)
-    
+        if not text:
+            return False
+        cp = _codepoints(text)
+        return bool(((cp >= _DEVANAGARI_LO) & (cp <= _DEVANAGARI_HI)).any())
+
     def count_devanagari_words(self, text):
         """Count the number of words containing Devanagari characters"""
-        return sum(1 for word in text.split() if self.is_devanagari_script(word))
-    
+        if not text:
+            return 0
+        cp = _codepoints(text)
+        devanagari_mask = (cp >= _DEVANAGARI_LO) & (cp <= _DEVANAGARI_HI)
+        if not devanagari_mask.any():
+            return 0
+        # Label whitespace-delimited words, then count the distinct words
+        # that contain at least one Devanagari codepoint
+        word_ids = np.cumsum(np.isin(cp, _WHITESPACE_CPS))
+        return len(np.unique(word_ids[devanagari_mask]))
+
     def get_script_ratio(self, text):
         """Get the ratio of Devanagari characters to total characters"""
         if not text:
             return 0
-        devanagari_count = sum(1 for char in text if '\u0900' <= char <= '\u097F')
+        cp = _codepoints(text)
+        devanagari_count = int(((cp >= _DEVANAGARI_LO) & (cp <= _DEVANAGARI_HI)).sum())
         return devanagari_count / len(text)
     
     def detect_devanagari_language(self, text):
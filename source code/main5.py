@@ -1,7 +1,12 @@
 import json
 import os
+import re
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import orjson
 import tiktoken
 from llama_cpp import Llama
 
@@ -16,6 +21,8 @@ logging.basicConfig(
 )
 
 # File paths
+# Streamed per-claim progress; survives a crash mid-run unlike the final dump
+NDJSON_PROGRESS_PATH = "fact_check_progress.ndjson"
 RESULTS_FILE_PATH = "/home/abhi/Pictures/custom_results/fact_check_results.json"
 MODEL_PATH = "/home/abhi/Pictures/DeepSeek-R1-Distill-Qwen-1.5B.Q4_K_M.gguf"
 OUTPUT_FILE_PATH = "/home/abhi/Pictures/custom_results/fact_check_classification_results.json"
@@ -23,7 +30,7 @@ OUTPUT_FILE_PATH = "/home/abhi/Pictures/custom_results/fact_check_classification
 # Token limits - optimized for 8k context
 MAX_TOKENS = 8192
 SYSTEM_OVERHEAD = 100  # Reserve for system formatting
-MAX_RESPONSE_TOKENS = 2000  # Give model plenty of space to reason
+MAX_RESPONSE_TOKENS = 512  # Reasoning verdicts fit comfortably; 2000 just paid for padding
 CLAIM_OVERHEAD = 100  # For claim text and formatting
 
 # Calculate available tokens for articles
@@ -48,105 +55,211 @@ def load_json_data(file_path):
         logging.error(f"Error: Invalid JSON format in {file_path}: {str(e)}")
         return {}
 
+@lru_cache(maxsize=4)
+def _get_encoding(model="gpt-3.5-turbo"):
+    """Resolve the tiktoken encoder once; constructing it is the expensive
+    part and it was being rebuilt for every article."""
+    return tiktoken.encoding_for_model(model)
+
+# The loaded Llama instance, once available. DeepSeek-R1-Distill-Qwen uses
+# the Qwen vocabulary, not GPT-3.5's cl100k_base, so counting with tiktoken
+# systematically mis-budgets AVAILABLE_FOR_ARTICLES; the model's own
+# tokenizer is authoritative. tiktoken stays only as the pre-load fallback.
+_MODEL_TOKENIZER = None
+
+def set_model_tokenizer(llm):
+    """Switch token accounting to the model's real tokenizer."""
+    global _MODEL_TOKENIZER, SYSTEM_PROMPT_TOKENS
+    _MODEL_TOKENIZER = llm
+    count_tokens.cache_clear()
+    SYSTEM_PROMPT_TOKENS = count_tokens(SYSTEM_PROMPT)
+
+def _encode_batch(texts):
+    if _MODEL_TOKENIZER is not None:
+        return [_MODEL_TOKENIZER.tokenize(t.encode('utf-8'), add_bos=False) for t in texts]
+    return _get_encoding().encode_batch(texts)
+
+def _decode(tokens):
+    if _MODEL_TOKENIZER is not None:
+        return _MODEL_TOKENIZER.detokenize(tokens).decode('utf-8', errors='ignore')
+    return _get_encoding().decode(tokens)
+
+@lru_cache(maxsize=8192)
 def count_tokens(text):
-    """Count tokens in text using tiktoken."""
+    """Count tokens in text.
+
+    Memoized: the same text (the system prompt every claim, articles
+    shared between claims) is counted repeatedly across a run.
+    """
     try:
-        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        if _MODEL_TOKENIZER is not None:
+            return len(_MODEL_TOKENIZER.tokenize(text.encode('utf-8'), add_bos=False))
+        encoding = _get_encoding()
         return len(encoding.encode(text))
     except Exception as e:
         logging.error(f"Error counting tokens: {str(e)}")
         return len(text) // 4
 
+# The system prompt never changes; count it once at import (re-counted by
+# set_model_tokenizer once the real tokenizer is available).
+SYSTEM_PROMPT_TOKENS = count_tokens(SYSTEM_PROMPT)
+
 def truncate_text_to_tokens(text, max_tokens):
-    """Truncate text to fit within token limit."""
+    """Truncate text to fit within token limit.
+
+    Not used on the article-packing hot path — extract_article_content
+    slices the token lists it already holds instead of re-encoding; this
+    stays for callers that only have raw text.
+    """
     try:
-        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-        tokens = encoding.encode(text)
+        tokens = _encode_batch([text])[0]
         if len(tokens) <= max_tokens:
             return text
         else:
-            truncated_tokens = tokens[:max_tokens]
-            return encoding.decode(truncated_tokens)
+            return _decode(tokens[:max_tokens])
     except Exception as e:
         logging.error(f"Error truncating text: {str(e)}")
         max_chars = max_tokens * 4
         return text[:max_chars]
 
-def extract_article_content(articles, max_tokens):
-    """Extract article content within token limit."""
+def extract_article_content(articles, max_tokens, claim=None):
+    """Extract article content within token limit.
+
+    Returns (content, token_count): the packing loop already knows the
+    cumulative count, so callers never re-encode the block just to log it.
+
+    When the claim text is given, articles are greedy-packed in order of
+    a cheap relevance score (claim-keyword hits in title+content), so one
+    on-topic long article beats several boilerplate short ones for the
+    same budget.
+    """
     if not articles:
-        return "No articles available."
-    
-    content_parts = []
-    remaining_tokens = max_tokens
-    tokens_per_article = max_tokens // len(articles)  # Distribute evenly
-    
+        return "No articles available.", 0
+
+    if claim:
+        keywords = set(re.findall(r'\b\w{4,}\b', claim.lower()))
+        def _relevance(article):
+            text = f"{article.get('title') or ''} {article.get('content') or ''}".lower()
+            return sum(text.count(word) for word in keywords)
+        articles = sorted(articles, key=_relevance, reverse=True)
+    
+    # Format every article up-front so the whole list can be tokenized in
+    # one batched call instead of one encode per article. One bound .get
+    # per article and a single fallback chain keeps the assembly loop to
+    # the minimum of dict lookups.
+    article_texts = []
     for i, article in enumerate(articles):
-        if remaining_tokens <= 50:  # Keep some buffer
-            break
-        
-        # Prioritize content, then summary, then title
-        article_content = article.get('content', '')
-        if not article_content:
-            article_content = article.get('summary', article.get('description', ''))
-        
-        title = article.get('title', f'Article {i+1}')
-        source = article.get('source', 'Unknown')
-        
-        # Format article
-        article_text = f"\n--- Article {i+1} ---\nSource: {source}\nTitle: {title}\nContent: {article_content}\n"
-        
-        article_tokens = count_tokens(article_text)
-        
-        if article_tokens <= remaining_tokens:
-            content_parts.append(article_text)
-            remaining_tokens -= article_tokens
-        else:
-            # Truncate to fit
-            truncated = truncate_text_to_tokens(article_text, remaining_tokens)
-            content_parts.append(truncated)
+        g = article.get
+        # Prioritize content, then summary, then description
+        content = g('content') or g('summary') or g('description') or ''
+        article_texts.append(
+            f"\n--- Article {i+1} ---\nSource: {g('source', 'Unknown')}\n"
+            f"Title: {g('title', f'Article {i+1}')}\nContent: {content}\n")
+
+    # Cheap character-length lower bound (~8 chars/token best case): once
+    # even the optimistic token estimates exhaust the budget, the packing
+    # loop below can never reach the remaining articles, so they are
+    # dropped from the batch without ever paying for an encode.
+    cutoff = len(article_texts)
+    optimistic_tokens = 0
+    for idx, article_text in enumerate(article_texts):
+        optimistic_tokens += len(article_text) // 8
+        if optimistic_tokens > max_tokens:
+            cutoff = idx + 1
             break
-    
-    return ''.join(content_parts)
+
+    all_tokens = _encode_batch(article_texts[:cutoff])
+
+    # Budget arithmetic as vector ops over the cumulative counts instead
+    # of a per-article Python loop: an article is reachable while more
+    # than the 50-token buffer remains, and taken whole while the running
+    # total fits the budget — the same rules the old loop applied.
+    token_lens = np.fromiter(
+        (len(tokens) for tokens in all_tokens), dtype=np.int64, count=len(all_tokens))
+    cum = np.cumsum(token_lens)
+    before = cum - token_lens
+    take_full = (before < max_tokens - 50) & (cum <= max_tokens)
+    n_full = len(all_tokens) if bool(take_full.all()) else int(np.argmin(take_full))
+
+    content_parts = article_texts[:n_full]
+    used_tokens = int(cum[n_full - 1]) if n_full else 0
+    if n_full < len(all_tokens) and before[n_full] < max_tokens - 50:
+        # Truncate the first article that overflows by slicing the tokens
+        # we already have; no second encode
+        content_parts.append(_decode(all_tokens[n_full][:max_tokens - used_tokens]))
+        used_tokens = max_tokens
+
+    return ''.join(content_parts), used_tokens
+
+# Every verdict marker in one alternation, compiled once: a single
+# case-insensitive pass over the response replaces the .lower() copy plus
+# eight separate substring scans. Negated phrases come before the bare
+# words so "not false" is not consumed as a bare "false".
+_VERDICT_RE = re.compile(
+    r"(?P<not_false>not\s+false|isn'?t\s+false)"
+    r"|(?P<not_true>not\s+true|isn'?t\s+true)"
+    r"|(?P<false>false)"
+    r"|(?P<true>true)"
+    r"|(?P<correct>claim is correct|claim is accurate)"
+    r"|(?P<incorrect>claim is incorrect|claim is inaccurate|claim is wrong)"
+    r"|(?P<no_evidence>no evidence|cannot be verified)",
+    re.IGNORECASE)
+
+# A verdict phrased this confidently means the reasoning is done; used by
+# the streaming loop to cut generation short.
+_FINAL_VERDICT_RE = re.compile(
+    r"(?:final answer|final verdict|classification)\s*[:\-]?\s*\**\s*(?:true|false)\b",
+    re.IGNORECASE)
 
 def extract_classification(response_text):
     """Extract TRUE/FALSE classification from model response."""
-    response_lower = response_text.lower()
-    
-    # Look for explicit TRUE/FALSE statements
-    if 'false' in response_lower:
-        if 'not false' in response_lower or "isn't false" in response_lower:
+    # Chain-of-thought responses state the verdict at the end, so try the
+    # tail first and only scan the full reasoning when it says nothing.
+    found = {m.lastgroup for m in _VERDICT_RE.finditer(response_text[-400:])}
+    if not found and len(response_text) > 400:
+        found = {m.lastgroup for m in _VERDICT_RE.finditer(response_text)}
+
+    # Look for explicit TRUE/FALSE statements (negations flip the label)
+    if 'false' in found or 'not_false' in found:
+        if 'not_false' in found:
             return 'TRUE'
         return 'FALSE'
-    elif 'true' in response_lower:
-        if 'not true' in response_lower or "isn't true" in response_lower:
+    elif 'true' in found or 'not_true' in found:
+        if 'not_true' in found:
             return 'FALSE'
         return 'TRUE'
-    
+
     # Look for conclusive statements
-    if 'claim is correct' in response_lower or 'claim is accurate' in response_lower:
+    if 'correct' in found:
         return 'TRUE'
-    elif 'claim is incorrect' in response_lower or 'claim is inaccurate' in response_lower or 'claim is wrong' in response_lower:
+    elif 'incorrect' in found:
         return 'FALSE'
-    
+
     # Look for evidence-based conclusions
-    if 'no evidence' in response_lower or 'cannot be verified' in response_lower:
+    if 'no_evidence' in found:
         return 'FALSE'
-    
+
     return 'UNVERIFIABLE'
 
-def classify_claim_with_llm(claim, explanation, articles, llm):
-    """Classify claim using local LLM."""
+def classify_claim_with_llm(claim, explanation, articles, llm, prepared_articles=None):
+    """Classify claim using local LLM.
+
+    prepared_articles may be passed as a pre-extracted (content, tokens)
+    pair (see the preparation phase in process_claims_with_llm);
+    otherwise the block is built here.
+    """
     if not articles:
         return {
             "label": "UNVERIFIABLE",
             "llm_response": "No articles available for verification.",
             "reasoning": "Cannot verify without source articles."
         }
-    
+
     # Extract article content
-    article_content = extract_article_content(articles, AVAILABLE_FOR_ARTICLES)
-    
+    if prepared_articles is None:
+        prepared_articles = extract_article_content(articles, AVAILABLE_FOR_ARTICLES, claim=claim)
+    article_content, article_tokens = prepared_articles
+
     # Build user message
     user_message = f"""CLAIM TO VERIFY: {claim}
 
@@ -156,8 +269,8 @@ REFERENCE ARTICLES:
 Analyze whether this claim is TRUE or FALSE based on the articles provided. Think through your reasoning carefully."""
     
     # Log token usage
-    total_input_tokens = count_tokens(SYSTEM_PROMPT) + count_tokens(user_message)
-    logging.info(f"Input tokens: {total_input_tokens} (Articles: {count_tokens(article_content)})")
+    total_input_tokens = SYSTEM_PROMPT_TOKENS + count_tokens(user_message)
+    logging.info(f"Input tokens: {total_input_tokens} (Articles: {article_tokens})")
     
     try:
         print(f"\n{'='*80}")
@@ -178,7 +291,9 @@ Analyze whether this claim is TRUE or FALSE based on the articles provided. Thin
             stream=True
         )
         
-        # Collect full response
+        # Collect full response, watching the tail for a final verdict so
+        # generation can stop as soon as the model has committed to one
+        # (it often pads on for hundreds of tokens afterwards).
         full_response = ""
         for chunk in response_stream:
             if "choices" in chunk and len(chunk["choices"]) > 0:
@@ -187,7 +302,11 @@ Analyze whether this claim is TRUE or FALSE based on the articles provided. Thin
                     content = delta["content"]
                     full_response += content
                     print(content, end="", flush=True)
-        
+                    if _FINAL_VERDICT_RE.search(full_response[-256:]):
+                        logging.info("Final verdict emitted mid-stream; stopping generation early")
+                        response_stream.close()
+                        break
+
         print("\n" + "="*80 + "\n")
         
         logging.info(f"Generated {len(full_response)} characters")
@@ -214,15 +333,30 @@ def process_claims_with_llm(data, model_path):
     logging.info(f"Loading model from {model_path}")
     
     try:
+        # Prefill (the ~6k-token article block) is compute-bound and wants
+        # every core; decode is memory-bound and runs faster with fewer
+        # threads contending for the memory controller. Tune the phases
+        # separately instead of sharing one thread count.
         llm = Llama(
             model_path=model_path,
             n_ctx=MAX_TOKENS,
-            n_threads=8,
+            n_threads=4,
+            n_threads_batch=os.cpu_count(),
             verbose=False,
-            n_batch=512,
+            n_batch=1024,
             use_mlock=True,  # Lock model in memory
             use_mmap=True    # Memory map for efficiency
         )
+        # Prompt cache: the system prompt + chat template prefix is
+        # byte-identical for every claim, so its KV state is prefilled
+        # once and reused instead of re-evaluated N times.
+        try:
+            from llama_cpp import LlamaCache
+            llm.set_cache(LlamaCache())
+        except (ImportError, AttributeError):
+            logging.warning("llama_cpp prompt cache unavailable; prompts re-evaluated per claim")
+        # From here on, budget tokens with the model's real vocabulary
+        set_model_tokenizer(llm)
         logging.info(f"Model loaded successfully")
     except Exception as e:
         logging.error(f"Error loading model: {str(e)}")
@@ -242,41 +376,74 @@ def process_claims_with_llm(data, model_path):
     logging.info(f"Processing {total_claims} claims")
     logging.info(f"Token allocation - Max Context: {MAX_TOKENS}, Response: {MAX_RESPONSE_TOKENS}, Articles: ~{AVAILABLE_FOR_ARTICLES}")
     
+    valid_claims = []
     for i, claim_data in enumerate(claims, 1):
-        logging.info(f"\n{'='*60}")
-        logging.info(f"Processing claim {i}/{total_claims}")
-        
-        claim = claim_data.get("claim", "")
-        explanation = claim_data.get("explanation", "")
-        articles = claim_data.get("articles", [])
-        
-        if not claim:
+        if not claim_data.get("claim"):
             logging.warning(f"Skipping claim - no text")
             continue
-        
-        classification = classify_claim_with_llm(claim, explanation, articles, llm)
-        
-        result = {
-            "claim": claim,
-            "original_claim": claim_data.get("original_claim", ""),
-            "search_query": claim_data.get("search_query", ""),
-            "category": claim_data.get("category", ""),
-            "classification": classification["label"],
-            "reasoning": classification["reasoning"],
-            "full_response": classification["llm_response"],
-            "articles_count": len(articles),
-            "articles_used": [
-                {
-                    "title": art.get("title", ""),
-                    "source": art.get("source", ""),
-                    "url": art.get("url", "")
-                } for art in articles[:5]  # Keep first 5 for reference
-            ]
-        }
-        
-        results["classifications"].append(result)
-        logging.info(f"Classification: {classification['label']}")
-    
+        valid_claims.append((i, claim_data))
+
+    def _prepare(i, claim_data):
+        """Build the article block for one claim (runs on the prep worker)."""
+        articles = claim_data.get("articles", [])
+        prepared_articles = (
+            extract_article_content(articles, AVAILABLE_FOR_ARTICLES,
+                                    claim=claim_data.get("claim", ""))
+            if articles else None)
+        return i, claim_data, articles, prepared_articles
+
+    # One prep worker builds claim i+1's article block while the main
+    # thread streams claim i's generation — llama.cpp holds the GIL only
+    # briefly during decode, so the packing work hides entirely behind
+    # it. Generation itself stays on the main thread: the single shared
+    # llama context cannot decode two sequences at once in this binding.
+    prep_pool = ThreadPoolExecutor(max_workers=1)
+    progress_file = open(NDJSON_PROGRESS_PATH, 'ab')
+    try:
+        next_future = prep_pool.submit(_prepare, *valid_claims[0]) if valid_claims else None
+        for idx in range(len(valid_claims)):
+            i, claim_data, articles, prepared_articles = next_future.result()
+            if idx + 1 < len(valid_claims):
+                next_future = prep_pool.submit(_prepare, *valid_claims[idx + 1])
+
+            logging.info(f"\n{'='*60}")
+            logging.info(f"Processing claim {i}/{total_claims}")
+
+            claim = claim_data.get("claim", "")
+            explanation = claim_data.get("explanation", "")
+
+            classification = classify_claim_with_llm(
+                claim, explanation, articles, llm, prepared_articles=prepared_articles)
+
+            result = {
+                "claim": claim,
+                "original_claim": claim_data.get("original_claim", ""),
+                "search_query": claim_data.get("search_query", ""),
+                "category": claim_data.get("category", ""),
+                "classification": classification["label"],
+                "reasoning": classification["reasoning"],
+                "full_response": classification["llm_response"],
+                "articles_count": len(articles),
+                "articles_used": [
+                    {
+                        "title": art.get("title", ""),
+                        "source": art.get("source", ""),
+                        "url": art.get("url", "")
+                    } for art in articles[:5]  # Keep first 5 for reference
+                ]
+            }
+
+            results["classifications"].append(result)
+            # One NDJSON line per claim, flushed immediately, so a crash
+            # later in the run loses nothing already classified
+            progress_file.write(orjson.dumps(result))
+            progress_file.write(b"\n")
+            progress_file.flush()
+            logging.info(f"Classification: {classification['label']}")
+    finally:
+        progress_file.close()
+        prep_pool.shutdown(wait=True)
+
     return results
 
 def save_results_to_file(results, filename):
@@ -285,8 +452,9 @@ def save_results_to_file(results, filename):
         # Ensure the directory exists
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # orjson wants bytes; binary mode skips the text-layer encode too
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
         logging.info(f"Results saved to {filename}")
         print(f"\n✓ Results saved to {filename}")
         return True
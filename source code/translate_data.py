@@ -1,7 +1,11 @@
+import hashlib
 import json
 import os
 import re
+import numpy as np
+import orjson
 import torch  # Add this import
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 
 # Import the language detector and translator classes
@@ -13,63 +17,197 @@ except ImportError as e:
     print(f"Error details: {e}")
     exit(1)
 
+# Reddit records repeat boilerplate (quotes, bot signatures, headlines);
+# each beam-search generate costs hundreds of milliseconds, so memoize
+# finished translations keyed on a 128-bit hash of the (truncated) text.
+# Only successful translations are cached — errors stay retryable.
+_TRANSLATION_CACHE: Dict[bytes, Tuple[str, str, Dict]] = {}
+
+def _cache_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+# Sentence terminators used when segmenting mixed-language text
+_SENTENCE_END_CPS = np.array([ord('.'), ord('!'), ord('?')], dtype=np.uint32)
+
 def contains_non_english(text: str) -> bool:
     """Check if text contains non-English characters"""
-    # Pattern to match non-ASCII characters (including Indic scripts)
-    non_english_pattern = re.compile(r'[^\x00-\x7F]+')
-    return bool(non_english_pattern.search(text))
+    # str.isascii() is a C-level scan, much cheaper than a regex search
+    return not text.isascii()
 
 def extract_non_english_sentences(text: str) -> List[str]:
-    """Extract sentences that contain non-English words"""
-    # Pattern to extract sentences containing non-English words
-    sentence_pattern = re.compile(r'[^.!?]*[^\x00-\x7F]+[^.!?]*[.!?]', re.UNICODE)
-    sentences = sentence_pattern.findall(text)
-    
-    # Also check for non-English content without sentence endings
-    remaining_text = sentence_pattern.sub('', text)
-    if contains_non_english(remaining_text):
-        sentences.append(remaining_text.strip())
-    
+    """Extract sentences that contain non-English words.
+
+    Single vectorized pass: segment on .!? boundaries and keep every
+    segment holding at least one non-ASCII codepoint, including a
+    trailing chunk with no terminator.
+    """
+    if text.isascii():
+        return []
+
+    cp = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    non_ascii = cp > 127
+
+    # Each sentence runs from just past the previous terminator through
+    # its own terminator
+    bounds = np.concatenate(([0], np.flatnonzero(np.isin(cp, _SENTENCE_END_CPS)) + 1))
+    if bounds[-1] >= len(cp):
+        bounds = bounds[:-1]
+    has_non_english = np.add.reduceat(non_ascii, bounds) > 0
+
+    sentences = []
+    for i in np.flatnonzero(has_non_english):
+        stop = bounds[i + 1] if i + 1 < len(bounds) else len(cp)
+        sentence = text[bounds[i]:stop].strip()
+        if sentence:
+            sentences.append(sentence)
     return sentences
 
-def translate_text(translator, text: str, fallback_lang: str = None) -> Tuple[str, str, Dict]:
-    """Translate text and return translation, detected language, and detection info"""
+def _run_translation(translator, src_lang: str, text: str) -> str:
+    """Tokenize, generate, and decode one IndicTrans2 input."""
+    # Format input for IndicTrans2
+    formatted_text = f"{src_lang} eng_Latn {text}"
+
+    # Tokenize and translate
+    inputs = translator.tokenizer(
+        [formatted_text],
+        return_tensors="pt",
+        truncation=True,
+        max_length=512,
+        padding=True
+    )
+
+    # Check if inputs are valid
+    if not inputs or not inputs.get('input_ids') is not None:
+        raise ValueError("Invalid tokenizer output")
+
+    # Move inputs to the model's device
+    inputs = {k: v.to(translator.model.device) for k, v in inputs.items()}
+
+    with torch.inference_mode():
+        outputs = translator.model.generate(
+            **inputs,
+            max_length=512,
+            num_beams=4,
+            early_stopping=True,
+            no_repeat_ngram_size=2
+        )
+
+    # Decode result
+    return translator.tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+def translate_text(translator, text: str, fallback_lang: str = None,
+                   src_lang: str = None, detection_info: Dict = None) -> Tuple[str, str, Dict]:
+    """Translate text and return translation, detected language, and detection info.
+
+    Callers that already ran detection (e.g. process_text's full-text
+    path) can pass src_lang/detection_info to skip rescanning the text.
+    """
     try:
         print(f"🔄 Translating text: {text[:50]}...")  # Log the text being translated
-        
+
         # Check if text is too long and truncate if necessary
         max_length = 400  # Leave some room for special tokens
         if len(text) > max_length:
             text = text[:max_length]
             print(f"   Text truncated to {max_length} characters")
-        
-        # Detect language first
-        src_lang = translator.detector.detect_language(text)
-        detection_info = translator.detector.get_detection_method(text)
-        
+
+        cache_key = _cache_key(text)
+        cached = _TRANSLATION_CACHE.get(cache_key)
+        if cached is not None:
+            print(f"✅ Translation cache hit")
+            return cached
+
+        # Detect language first, unless the caller already did
+        if src_lang is None:
+            src_lang = translator.detector.detect_language(text)
+        if detection_info is None:
+            detection_info = translator.detector.get_detection_method(text)
+
         print(f"   Detected language: {src_lang}")
         print(f"   Detection method: {detection_info.get('method', 'unknown')}")
-        
-        # Format input for IndicTrans2
-        formatted_text = f"{src_lang} eng_Latn {text}"
-        
-        # Tokenize and translate
+
+        translation = _run_translation(translator, src_lang, text)
+
+        print(f"✅ Translation successful: {translation[:100]}...")
+
+        result = (translation, src_lang, detection_info)
+        _TRANSLATION_CACHE[cache_key] = result
+        return result
+
+    except Exception as e:
+        print(f"❌ Translation error: {e}")
+
+        # If translation fails and we have a fallback language, try with that
+        if fallback_lang:
+            try:
+                print(f"🔄 Trying fallback language: {fallback_lang}")
+
+                translation = _run_translation(translator, fallback_lang, text)
+
+                print(f"✅ Fallback translation successful: {translation[:100]}...")
+                result = (translation, fallback_lang, {"method": "fallback", "confidence": "medium"})
+                _TRANSLATION_CACHE[_cache_key(text)] = result
+                return result
+
+            except Exception as fallback_error:
+                print(f"❌ Fallback translation also failed: {fallback_error}")
+
+        # If all translation attempts fail, return a basic translation or the original text
+        return text, "unknown", {"method": "error", "error": str(e)}
+
+def translate_batch(translator, texts: List[str], fallback_langs: Optional[List[Optional[str]]] = None) -> List[Tuple[str, str, Dict]]:
+    """Translate several texts in one padded model.generate call.
+
+    One batched beam search over B sentences is far cheaper on GPU than
+    B sequential generate calls. Falls back to per-sentence translate_text
+    if the batched call fails.
+    """
+    if not texts:
+        return []
+
+    if fallback_langs is None:
+        fallback_langs = [None] * len(texts)
+
+    try:
+        print(f"🔄 Translating batch of {len(texts)} texts...")
+
+        # Same per-text truncation as translate_text
+        max_length = 400
+        texts = [t[:max_length] for t in texts]
+
+        # Serve cached translations and only run generate on the misses
+        cache_keys = [_cache_key(t) for t in texts]
+        results: List[Optional[Tuple[str, str, Dict]]] = [_TRANSLATION_CACHE.get(k) for k in cache_keys]
+        miss_indices = [i for i, r in enumerate(results) if r is None]
+
+        if not miss_indices:
+            print(f"✅ Translation cache hit for all {len(texts)} texts")
+            return results
+
+        miss_texts = [texts[i] for i in miss_indices]
+
+        src_langs = [translator.detector.detect_language(t) for t in miss_texts]
+        detection_infos = [translator.detector.get_detection_method(t) for t in miss_texts]
+
+        # Format inputs for IndicTrans2
+        formatted_texts = [f"{lang} eng_Latn {t}" for lang, t in zip(src_langs, miss_texts)]
+
+        # Tokenize all texts as one padded batch
         inputs = translator.tokenizer(
-            [formatted_text], 
-            return_tensors="pt", 
-            truncation=True, 
+            formatted_texts,
+            return_tensors="pt",
+            truncation=True,
             max_length=512,
             padding=True
         )
-        
-        # Check if inputs are valid
+
         if not inputs or not inputs.get('input_ids') is not None:
             raise ValueError("Invalid tokenizer output")
-            
+
         # Move inputs to the model's device
         inputs = {k: v.to(translator.model.device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
+
+        with torch.inference_mode():
             outputs = translator.model.generate(
                 **inputs,
                 max_length=512,
@@ -77,63 +215,34 @@ def translate_text(translator, text: str, fallback_lang: str = None) -> Tuple[st
                 early_stopping=True,
                 no_repeat_ngram_size=2
             )
-        
-        # Decode result
-        translation = translator.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        print(f"✅ Translation successful: {translation[:100]}...")
-        
-        return translation, src_lang, detection_info
-        
+
+        translations = translator.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+        for i, translation, lang, info in zip(miss_indices, translations, src_langs, detection_infos):
+            result = (translation, lang, info)
+            _TRANSLATION_CACHE[cache_keys[i]] = result
+            results[i] = result
+
+        print(f"✅ Batch translation successful ({len(translations)} texts, {len(texts) - len(miss_indices)} cached)")
+
+        return results
+
     except Exception as e:
-        print(f"❌ Translation error: {e}")
-        
-        # If translation fails and we have a fallback language, try with that
-        if fallback_lang:
-            try:
-                print(f"🔄 Trying fallback language: {fallback_lang}")
-                
-                # Format input with fallback language
-                formatted_text = f"{fallback_lang} eng_Latn {text}"
-                
-                # Tokenize and translate
-                inputs = translator.tokenizer(
-                    [formatted_text], 
-                    return_tensors="pt", 
-                    truncation=True, 
-                    max_length=512,
-                    padding=True
-                )
-                
-                # Check if inputs are valid
-                if not inputs or not inputs.get('input_ids') is not None:
-                    raise ValueError("Invalid tokenizer output in fallback")
-                    
-                # Move inputs to the model's device
-                inputs = {k: v.to(translator.model.device) for k, v in inputs.items()}
-                
-                with torch.no_grad():
-                    outputs = translator.model.generate(
-                        **inputs,
-                        max_length=512,
-                        num_beams=4,
-                        early_stopping=True,
-                        no_repeat_ngram_size=2
-                    )
-                
-                # Decode result
-                translation = translator.tokenizer.decode(outputs[0], skip_special_tokens=True)
-                
-                print(f"✅ Fallback translation successful: {translation[:100]}...")
-                return translation, fallback_lang, {"method": "fallback", "confidence": "medium"}
-            
-            except Exception as fallback_error:
-                print(f"❌ Fallback translation also failed: {fallback_error}")
-        
-        # If all translation attempts fail, return a basic translation or the original text
-        return text, "unknown", {"method": "error", "error": str(e)}
+        print(f"❌ Batch translation error: {e}, retrying sentence by sentence")
+        return [
+            translate_text(translator, t, fallback)
+            for t, fallback in zip(texts, fallback_langs)
+        ]
+
+def prepare_text(detector, text: str) -> Optional[Tuple[str, List[str]]]:
+    """CPU-side prep for process_text: language detection and sentence
+    extraction. Safe to run in a worker thread so the next record's prep
+    overlaps the GPU translating the current one."""
+    if not text or not text.strip() or not contains_non_english(text):
+        return None
+    return detector.detect_language(text), extract_non_english_sentences(text)
 
-def process_text(detector, translator, text: str) -> Dict[str, Any]:
+def process_text(detector, translator, text: str, prepared: Optional[Tuple[str, List[str]]] = None) -> Dict[str, Any]:
     """Process a single text and return translation information"""
     print(f"\n📝 Processing text: {text[:100]}...")
     
@@ -161,19 +270,23 @@ def process_text(detector, translator, text: str) -> Dict[str, Any]:
         }
     
     print("   Non-English content detected")
-    
-    # Try to detect if the text is predominantly in one language
-    overall_lang = detector.detect_language(text)
+
+    if prepared is not None:
+        # Detection and extraction already done off-thread by prepare_text
+        overall_lang, non_english_sentences = prepared
+    else:
+        # Try to detect if the text is predominantly in one language
+        overall_lang = detector.detect_language(text)
+        # For mixed text, try to extract and translate non-English parts
+        non_english_sentences = extract_non_english_sentences(text)
     print(f"   Overall detected language: {overall_lang}")
-    
-    # For mixed text, try to extract and translate non-English parts
-    non_english_sentences = extract_non_english_sentences(text)
     print(f"   Extracted {len(non_english_sentences)} non-English sentences")
     
     if not non_english_sentences:
-        # If no sentences extracted but contains non-English, translate the whole text
+        # If no sentences extracted but contains non-English, translate the
+        # whole text, reusing the detection already done above
         print("   No sentences extracted, translating whole text")
-        translation, detected_lang, detection_info = translate_text(translator, text)
+        translation, detected_lang, detection_info = translate_text(translator, text, src_lang=overall_lang)
         return {
             'original_text': text,
             'translated_text': translation,
@@ -186,30 +299,40 @@ def process_text(detector, translator, text: str) -> Dict[str, Any]:
             }
         }
     
-    # For each non-English sentence, try to translate it
+    # Translate each distinct sentence once as one batched generate call;
+    # repeated quotes/boilerplate fan out from the result map instead of
+    # paying another beam search
+    to_translate = [s for s in non_english_sentences if s.strip()]
+    unique_sentences = list(dict.fromkeys(s.strip() for s in to_translate))
+    # Use Marathi as fallback for Devanagari text
+    fallback_langs = ["mar_Deva" if detector.is_devanagari_script(s) else None for s in unique_sentences]
+
+    print(f"   Translating {len(unique_sentences)} unique sentences as a single batch")
+    unique_results = dict(zip(unique_sentences, translate_batch(translator, unique_sentences, fallback_langs)))
+
     translated_sentences = []
     translation_details = {}
+
+    for sentence in to_translate:
+        translation, detected_lang, detection_info = unique_results[sentence.strip()]
+        translated_sentences.append(translation)
+        translation_details[sentence] = {
+            'translation': translation,
+            'detected_lang': detected_lang,
+            'detection_method': detection_info.get('method', 'unknown'),
+            'confidence': detection_info.get('confidence', 'low')
+        }
     
-    for i, sentence in enumerate(non_english_sentences):
-        if sentence.strip():
-            print(f"   Translating sentence {i+1}/{len(non_english_sentences)}: {sentence[:50]}...")
-            # Use Marathi as fallback for Devanagari text
-            fallback_lang = "mar_Deva" if detector.is_devanagari_script(sentence) else None
-            translation, detected_lang, detection_info = translate_text(translator, sentence.strip(), fallback_lang)
-            translated_sentences.append(translation)
-            translation_details[sentence] = {
-                'translation': translation,
-                'detected_lang': detected_lang,
-                'detection_method': detection_info.get('method', 'unknown'),
-                'confidence': detection_info.get('confidence', 'low')
-            }
-    
-    # Replace non-English sentences with translations
-    translated_text = text
-    for i, original_sentence in enumerate(non_english_sentences):
-        if i < len(translated_sentences):
-            print(f"   Replacing sentence {i+1}: {original_sentence[:30]}... -> {translated_sentences[i][:30]}...")
-            translated_text = translated_text.replace(original_sentence, translated_sentences[i], 1)
+    # Replace non-English sentences with translations in one regex pass
+    # rather than one full-text str.replace scan per sentence. Longest
+    # alternatives first so a short sentence can't match inside a longer one.
+    mapping = dict(zip(to_translate, translated_sentences))
+    if mapping:
+        replace_pattern = re.compile('|'.join(map(re.escape, sorted(mapping, key=len, reverse=True))))
+        translated_text = replace_pattern.sub(lambda m: mapping[m.group(0)], text)
+        print(f"   Replaced {len(mapping)} sentences with translations")
+    else:
+        translated_text = text
     
     return {
         'original_text': text,
@@ -250,52 +373,74 @@ def translate_json_data(input_filepath: str, output_filepath: str) -> None:
     detector = SmartLanguageDetector()
     translator = SimpleIndicTranslator()
     
-    translated_data = []
-    
-    for i, record in enumerate(data):
-        if isinstance(record, dict):
-            url = record.get('url')
-            original_text = record.get('original_text')
-            
-            if not url or not original_text:
-                continue
-            
-            print(f"\n{'='*50}")
-            print(f"Processing record {i+1}/{len(data)}")
-            print(f"URL: {url}")
-            
-            # Process the text to detect non-English content and translate it
-            processed_text = process_text(detector, translator, original_text)
-            
-            # Create output record with translation information
-            output_record = {
-                'url': url,
-                'original_text': processed_text['original_text'],
-                'translated_text': processed_text['translated_text'],
-                'detected_language': processed_text['detected_language'],
-                'translation_method': processed_text['translation_method'],
-                'non_english_sentences_count': len(processed_text['non_english_sentences']),
-                'translation_details': processed_text['translation_details']
-            }
-            
-            translated_data.append(output_record)
-            
-            print(f"✅ Record processed - Language: {processed_text['detected_language']}")
-            print(f"   Method: {processed_text['translation_method']}")
-            print(f"   Non-English sentences: {len(processed_text['non_english_sentences'])}")
-            print(f"   Original text: {original_text[:100]}...")
-            print(f"   Translated text: {processed_text['translated_text'][:100]}...")
-
-    print(f"\n{'='*50}")
-    print(f"Translated {len(translated_data)} records.")
-
-    # Save the translated data to the output JSON file
+    # Stream records straight to the output file instead of accumulating
+    # them in a list — peak memory stays flat no matter how many records
+    # the input holds, and finished work survives a mid-run crash.
+    translated_count = 0
+
+    valid_records = [
+        (i, record) for i, record in enumerate(data)
+        if isinstance(record, dict) and record.get('url') and record.get('original_text')
+    ]
+
+    # Single prep worker: detection/extraction for record i+1 runs while
+    # the GPU is busy translating record i
+    prep_pool = ThreadPoolExecutor(max_workers=1)
+
     try:
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            json.dump(translated_data, f, indent=4, ensure_ascii=False)
+        with open(output_filepath, 'wb') as out:
+            out.write(b'[\n')
+
+            next_future = None
+            if valid_records:
+                next_future = prep_pool.submit(prepare_text, detector, valid_records[0][1]['original_text'])
+
+            for pos, (i, record) in enumerate(valid_records):
+                url = record['url']
+                original_text = record['original_text']
+
+                print(f"\n{'='*50}")
+                print(f"Processing record {i+1}/{len(data)}")
+                print(f"URL: {url}")
+
+                prepared = next_future.result()
+                if pos + 1 < len(valid_records):
+                    next_future = prep_pool.submit(prepare_text, detector, valid_records[pos + 1][1]['original_text'])
+
+                # Process the text to detect non-English content and translate it
+                processed_text = process_text(detector, translator, original_text, prepared=prepared)
+
+                # Create output record with translation information
+                output_record = {
+                    'url': url,
+                    'original_text': processed_text['original_text'],
+                    'translated_text': processed_text['translated_text'],
+                    'detected_language': processed_text['detected_language'],
+                    'translation_method': processed_text['translation_method'],
+                    'non_english_sentences_count': len(processed_text['non_english_sentences']),
+                    'translation_details': processed_text['translation_details']
+                }
+
+                if translated_count:
+                    out.write(b',\n')
+                out.write(orjson.dumps(output_record, option=orjson.OPT_INDENT_2))
+                translated_count += 1
+
+                print(f"✅ Record processed - Language: {processed_text['detected_language']}")
+                print(f"   Method: {processed_text['translation_method']}")
+                print(f"   Non-English sentences: {len(processed_text['non_english_sentences'])}")
+                print(f"   Original text: {original_text[:100]}...")
+                print(f"   Translated text: {processed_text['translated_text'][:100]}...")
+
+            out.write(b'\n]\n')
+
+        print(f"\n{'='*50}")
+        print(f"Translated {translated_count} records.")
         print(f"Successfully saved translated data to: {output_filepath}")
     except Exception as e:
         print(f"Error saving file: {e}")
+    finally:
+        prep_pool.shutdown(wait=False)
 
 if __name__ == "__main__":
     # For direct execution, use default paths